@@ -0,0 +1,149 @@
+# backend/benchmark_io.py
+"""
+Offline benchmark of the pooled/batched I/O layer against naive per-call
+connections. Uses an in-process HTTP stub and a temporary SQLite file, so no
+network or database server is needed:
+
+    python benchmark_io.py --calls 2000
+"""
+from typing import Any, Awaitable, Callable, Dict
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import httpx
+
+from pipeline_io import IOManager
+
+
+class StubHTTPTransport(httpx.AsyncBaseTransport):
+    """
+    In-process HTTP server stand-in with keep-alive semantics: a request pays
+    `connect_latency` only when no idle connection is available on this
+    transport, plus `request_latency` per request. JSON bodies are echoed;
+    a JSON array posted to /bulk is answered with an array of echoes.
+    """
+
+    def __init__(self, connect_latency: float = 0.005, request_latency: float = 0.002):
+        self.connect_latency = connect_latency
+        self.request_latency = request_latency
+        self.idle_connections = 0
+        self.connections_opened = 0
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.idle_connections:
+            self.idle_connections -= 1
+        else:
+            self.connections_opened += 1
+            await asyncio.sleep(self.connect_latency)
+        try:
+            self.requests += 1
+            await asyncio.sleep(self.request_latency)
+            body = json.loads(await request.aread() or b"null")
+            if request.url.path == "/bulk" and isinstance(body, list):
+                payload: Any = [{"echo": item} for item in body]
+            else:
+                payload = {"echo": body}
+            return httpx.Response(200, json=payload)
+        finally:
+            self.idle_connections += 1
+
+
+async def _timed(calls: int, concurrency: int, call: Callable[[int], Awaitable[Any]]) -> float:
+    """Run `calls` invocations with at most `concurrency` in flight; return calls/sec"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await call(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return calls / (time.perf_counter() - started)
+
+
+async def benchmark_http(calls: int, concurrency: int) -> Dict[str, float]:
+    async def naive(i: int):
+        # Fresh client and connection for every call
+        async with httpx.AsyncClient(transport=StubHTTPTransport()) as client:
+            (await client.post("http://stub.local/item", json={"i": i})).raise_for_status()
+
+    shared = StubHTTPTransport()
+    io = IOManager(http_transport=shared)
+
+    async def pooled(i: int):
+        await io.request("api_pooled", "POST", "http://stub.local/item", limit=concurrency, json={"i": i})
+
+    async def batched(i: int):
+        await io.bulk_request("api_batched", "http://stub.local/bulk", {"i": i},
+                              max_batch_size=64, limit=concurrency)
+
+    results = {
+        "naive": await _timed(calls, concurrency, naive),
+        "pooled": await _timed(calls, concurrency, pooled),
+        "pooled+batched": await _timed(calls, concurrency, batched),
+    }
+    await io.aclose()
+    return results
+
+
+async def benchmark_sqlite(calls: int, concurrency: int) -> Dict[str, float]:
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    try:
+        with sqlite3.connect(path) as connection:
+            connection.execute("CREATE TABLE events (id INTEGER, payload TEXT)")
+        insert = "INSERT INTO events (id, payload) VALUES (:id, :payload)"
+
+        def naive_insert(i: int):
+            connection = sqlite3.connect(path)
+            try:
+                with connection:
+                    connection.execute(insert, {"id": i, "payload": "x"})
+            finally:
+                connection.close()
+
+        async def naive(i: int):
+            await asyncio.to_thread(naive_insert, i)
+
+        io = IOManager()
+        dsn = f"sqlite:///{path}"
+
+        async def pooled(i: int):
+            await io.query("db_pooled", dsn, insert, {"id": i, "payload": "x"}, limit=1)
+
+        async def batched(i: int):
+            await io.query("db_batched", dsn, insert, {"id": i, "payload": "x"},
+                           max_batch_size=256, limit=1)
+
+        results = {
+            "naive": await _timed(calls, concurrency, naive),
+            "pooled": await _timed(calls, concurrency, pooled),
+            "pooled+batched": await _timed(calls, concurrency, batched),
+        }
+        await io.aclose()
+        return results
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    for name, bench in (("http", benchmark_http), ("sqlite", benchmark_sqlite)):
+        results = asyncio.run(bench(args.calls, args.concurrency))
+        baseline = results["naive"]
+        for mode, rate in results.items():
+            print(f"{name:7s} {mode:15s} {rate:10.0f} calls/s  ({rate / baseline:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# backend/llm_client.py
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+
+from pipeline_io import LoopLocal, MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_BATCH_SIZE = 16
+DEFAULT_LLM_BATCH_WAIT = 0.01
+DEFAULT_CACHE_SIZE = 10_000
+
+
+class LLMBackend(ABC):
+    """Model provider interface: complete a batch of prompts for one model and parameter set"""
+
+    @abstractmethod
+    async def generate_batch(self, model: str, params: Dict[str, Any], prompts: List[str]) -> List[str]:
+        """One completion per prompt, in order"""
+
+
+class FakeLLM(LLMBackend):
+    """
+    Deterministic local stand-in for a model provider. Each batch costs
+    `call_latency` plus `token_latency` per prompt, so batching pays off the
+    same way it does against a real API; the completion is a pure function of
+    (model, params, prompt).
+    """
+
+    def __init__(self, call_latency: float = 0.05, token_latency: float = 0.001):
+        self.call_latency = call_latency
+        self.token_latency = token_latency
+        self.calls = 0
+        self.prompts = 0
+
+    async def generate_batch(self, model: str, params: Dict[str, Any], prompts: List[str]) -> List[str]:
+        self.calls += 1
+        self.prompts += len(prompts)
+        await asyncio.sleep(self.call_latency + self.token_latency * len(prompts))
+        return [f"[{model}] {cache_key(model, params, prompt)[:16]}: {prompt[:64]}" for prompt in prompts]
+
+
+def cache_key(model: str, params: Dict[str, Any], prompt: str) -> str:
+    """Exact-match key over model, sampling parameters and the rendered prompt"""
+    payload = json.dumps({"model": model, "params": params, "prompt": prompt}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent key/value response store backed by a single SQLite file.
+    Calls block, so LLMClient runs them in worker threads; the lock keeps
+    those threads off the shared connection at the same time
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_many(self, items: List[Tuple[str, str]]):
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)", items)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class _LoopState:
+    """In-flight futures and batchers of one event loop"""
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.batchers: Dict[str, MicroBatcher] = {}
+
+
+class LLMClient:
+    """
+    LLM-call layer used by `llm` nodes.
+
+    Lookups go through an in-memory LRU, then the optional disk cache. Misses
+    for a prompt that is already in flight await the same future instead of
+    issuing a second call; the rest are gathered into micro-batches per
+    (model, params) of up to `max_batch_size` prompts. A prompt is sent at
+    once when no batch is in flight and waits at most `max_wait` seconds
+    otherwise.
+    Futures and batchers bind to an event loop and are kept per running loop,
+    dropped when it shuts down; the response caches are shared.
+    """
+
+    def __init__(self, backend: LLMBackend,
+                 max_batch_size: int = DEFAULT_LLM_BATCH_SIZE,
+                 max_wait: float = DEFAULT_LLM_BATCH_WAIT,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 cache_path: Optional[str] = None,
+                 max_concurrency: Optional[int] = None):
+        """
+        Args:
+            backend: Model provider (FakeLLM only for offline runs and benchmarks)
+            max_batch_size: Most prompts sent in one provider call
+            max_wait: Longest a prompt waits behind an in-flight batch, in seconds
+            cache_size: Entries kept in the in-memory LRU (0 disables it)
+            cache_path: Optional SQLite file for a persistent response cache
+            max_concurrency: Optional cap on concurrent provider calls
+        """
+        if backend is None:
+            raise ValueError("LLMClient needs a model backend")
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self.max_concurrency = max_concurrency
+        self.disk_cache = DiskCache(cache_path) if cache_path else None
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._states = LoopLocal(_LoopState)
+        self.stats = {"requests": 0, "memory_hits": 0, "disk_hits": 0, "deduplicated": 0, "misses": 0}
+        self._batches = 0
+        self._batched_prompts = 0
+
+    def _remember(self, key: str, value: str):
+        if self.cache_size <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.cache_size:
+            self._memory.popitem(last=False)
+
+    def _state(self) -> _LoopState:
+        return self._states.get()
+
+    async def _lookup(self, key: str) -> Optional[str]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return value
+        if self.disk_cache is not None:
+            value = await asyncio.to_thread(self.disk_cache.get, key)
+            if value is not None:
+                self._remember(key, value)
+                self.stats["disk_hits"] += 1
+                return value
+        return None
+
+    def _batcher(self, model: str, params: Dict[str, Any]) -> MicroBatcher:
+        group = json.dumps({"model": model, "params": params}, sort_keys=True, default=str)
+        batchers = self._state().batchers
+        batcher = batchers.get(group)
+        if batcher is None:
+            async def flush(items: List[Tuple[str, str]]) -> List[str]:
+                self._batches += 1
+                self._batched_prompts += len(items)
+                responses = await self.backend.generate_batch(model, params, [prompt for _, prompt in items])
+                if self.disk_cache is not None:
+                    await asyncio.to_thread(self.disk_cache.set_many, [(key, response) for (key, _), response in zip(items, responses)])
+                return responses
+
+            batcher = MicroBatcher(flush, self.max_batch_size, self.max_wait, self.max_concurrency)
+            batchers[group] = batcher
+        return batcher
+
+    async def complete(self, model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Completion for one rendered prompt, served from cache when possible"""
+        params = params or {}
+        key = cache_key(model, params, prompt)
+        self.stats["requests"] += 1
+
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached
+
+        pending = self._state().in_flight
+        in_flight = pending.get(key)
+        if in_flight is not None:
+            self.stats["deduplicated"] += 1
+            return await asyncio.shield(in_flight)
+
+        self.stats["misses"] += 1
+        future = asyncio.ensure_future(self._batcher(model, params).submit((key, prompt)))
+        pending[key] = future
+        future.add_done_callback(lambda done: self._settle(pending, key, done))
+        return await asyncio.shield(future)
+
+    def _settle(self, pending: Dict[str, asyncio.Future], key: str, future: asyncio.Future):
+        """Cache a finished call even if the request that started it was cancelled"""
+        pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._remember(key, future.result())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counters plus cache hit rate and average batch size"""
+        requests = self.stats["requests"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["deduplicated"]
+        batches = self._batches
+        prompts = self._batched_prompts
+        return {
+            **self.stats,
+            "hit_rate": hits / requests if requests else 0.0,
+            "batches": batches,
+            "avg_batch_size": prompts / batches if batches else 0.0,
+        }
+
+    def close(self):
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+
+
+_llm_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Process-wide LLMClient shared by all pipeline runs. There is no implicit
+    default: serving placeholder completions from FakeLLM would look like
+    success, so a missing backend fails the node instead
+    """
+    if _llm_client is None:
+        raise RuntimeError(
+            "No LLM backend configured - call llm_client.set_llm_client(LLMClient(backend)) at startup "
+            "(LLMClient(FakeLLM()) for offline runs)"
+        )
+    return _llm_client
+
+
+def set_llm_client(client: Optional[LLMClient]):
+    """Install the shared LLMClient with a provider backend"""
+    global _llm_client
+    _llm_client = client
@@ -1,11 +1,14 @@
 # backend/main.py
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 import logging
+import time
 from collections import defaultdict, deque
 
+from pipeline_layout import DEFAULT_LAYER_SPACING, DEFAULT_NODE_SPACING, compute_layout
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -57,6 +60,18 @@ class PipelineAnalysisResponse(BaseModel):
     cycle_info: Optional[List[str]] = None
     node_analysis: Optional[Dict[str, Any]] = None
 
+class PipelineLayoutRequest(PipelineData):
+    changed_node_ids: Optional[List[str]] = None
+    radius: int = Field(1, ge=0)
+    layer_spacing: float = Field(DEFAULT_LAYER_SPACING, gt=0)
+    node_spacing: float = Field(DEFAULT_NODE_SPACING, gt=0)
+
+class PipelineLayoutResponse(BaseModel):
+    positions: Dict[str, Dict[str, float]]
+    num_layers: int
+    mode: str
+    elapsed_ms: float
+
 class DAGAnalyzer:
     """Utility class for analyzing pipeline structure and detecting cycles"""
     
@@ -191,6 +206,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "parse": "/pipelines/parse",
+            "layout": "/pipelines/layout",
             "health": "/health"
         }
     }
@@ -336,6 +352,54 @@ async def validate_pipeline(pipeline: PipelineData):
         logger.error(f"Error validating pipeline: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Validation error: {str(e)}")
 
+@app.post("/pipelines/layout", response_model=PipelineLayoutResponse)
+def layout_pipeline(request: PipelineLayoutRequest):
+    """
+    Compute a layered (Sugiyama-style) layout for the pipeline.
+    With changed_node_ids only those nodes and their neighbourhood are re-laid out.
+    Layout is CPU-bound, so this is a plain def that FastAPI runs in its threadpool
+    """
+    try:
+        node_ids = [node.id for node in request.nodes]
+        node_id_set = set(node_ids)
+        invalid_edges = [
+            edge.id for edge in request.edges
+            if edge.source not in node_id_set or edge.target not in node_id_set
+        ]
+        if invalid_edges:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid edges reference non-existent nodes: {invalid_edges}"
+            )
+        
+        started = time.perf_counter()
+        positions, num_layers = compute_layout(
+            node_ids,
+            [(edge.source, edge.target) for edge in request.edges],
+            positions={node.id: node.position for node in request.nodes},
+            changed=request.changed_node_ids,
+            radius=request.radius,
+            layer_spacing=request.layer_spacing,
+            node_spacing=request.node_spacing,
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        mode = "incremental" if request.changed_node_ids is not None else "full"
+        
+        logger.info(f"Laid out {len(positions)} of {len(node_ids)} nodes ({mode}) in {elapsed_ms:.1f} ms")
+        
+        return PipelineLayoutResponse(
+            positions=positions,
+            num_layers=num_layers,
+            mode=mode,
+            elapsed_ms=elapsed_ms
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error laying out pipeline: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Layout error: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,275 @@
+# backend/node_handlers.py
+from typing import Any, Awaitable, Callable, Dict, Optional
+import json
+import logging
+import re
+
+from llm_client import get_llm_client
+from pipeline_io import DEFAULT_BATCH_WAIT, DEFAULT_NODE_CONCURRENCY, get_io_manager, query_params
+
+logger = logging.getLogger(__name__)
+
+# Sentinel returned by a handler that consumed a record without emitting one
+DROP = object()
+
+TEMPLATE_VARIABLE = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+class PipelineExecutionError(Exception):
+    """Raised when a node handler fails while processing a record"""
+
+    def __init__(self, node_id: str, error: BaseException):
+        self.node_id = node_id
+        self.error = error
+        super().__init__(f"Node {node_id} failed: {error}")
+
+
+class ExecutionNode:
+    """Executable view of a pipeline node: id, type and flattened node data"""
+
+    def __init__(self, node_id: str, node_type: str, config: Optional[Dict[str, Any]] = None):
+        self.id = node_id
+        self.type = node_type
+        self.config = config or {}
+
+    @classmethod
+    def from_node(cls, node: Any) -> "ExecutionNode":
+        """
+        Build from either a models.NodeData (dict data) or a main.PipelineNode
+        (pydantic data with extra fields allowed)
+        """
+        data = node.data or {}
+        config = dict(data) if not isinstance(data, dict) else data
+        return cls(node.id, node.type, config)
+
+    @property
+    def concurrency(self) -> int:
+        """Maximum number of records the node may process at once"""
+        try:
+            return max(int(self.config.get("concurrency") or 1), 1)
+        except (TypeError, ValueError):
+            return 1
+
+    def __repr__(self) -> str:
+        return f"ExecutionNode(id={self.id!r}, type={self.type!r})"
+
+
+NodeHandler = Callable[[ExecutionNode, Any], Awaitable[Any]]
+
+NODE_HANDLERS: Dict[str, NodeHandler] = {}
+
+
+def register_node_handler(node_type: str) -> Callable[[NodeHandler], NodeHandler]:
+    """Decorator registering the per-record handler for a node type"""
+    def decorator(handler: NodeHandler) -> NodeHandler:
+        NODE_HANDLERS[node_type] = handler
+        return handler
+    return decorator
+
+
+async def passthrough(node: ExecutionNode, record: Any) -> Any:
+    """Default handler: forward the record unchanged"""
+    return record
+
+
+def get_node_handler(node_type: str) -> NodeHandler:
+    """Look up the handler for a node type, falling back to pass-through"""
+    return NODE_HANDLERS.get(node_type, passthrough)
+
+
+def _field(record: Any, name: Optional[str]) -> Any:
+    """Read a field from a dict record; scalars (or an empty name) are the value itself"""
+    if name and isinstance(record, dict):
+        return record.get(name)
+    return record
+
+
+def render_template(template: str, record: Any) -> str:
+    """Substitute {{ variable }} placeholders from a dict record (or the record itself)"""
+    def replace(match: "re.Match") -> str:
+        value = _field(record, match.group(1)) if isinstance(record, dict) else record
+        return "" if value is None else str(value)
+    return TEMPLATE_VARIABLE.sub(replace, template)
+
+
+@register_node_handler("text")
+async def text_handler(node: ExecutionNode, record: Any) -> Any:
+    """Render the node's text template against the record"""
+    template = node.config.get("text")
+    if not template:
+        return record
+    return render_template(template, record)
+
+
+FILTER_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "equals": lambda left, right: str(left) == str(right),
+    "not_equals": lambda left, right: str(left) != str(right),
+    "contains": lambda left, right: str(right) in str(left),
+    "greater_than": lambda left, right: float(left) > float(right),
+    "less_than": lambda left, right: float(left) < float(right),
+}
+
+
+@register_node_handler("filter")
+async def filter_handler(node: ExecutionNode, record: Any) -> Any:
+    """Keep the record only when `condition` field `operator` `value` holds"""
+    operator = FILTER_OPERATORS.get(node.config.get("operator") or "equals")
+    value = node.config.get("value")
+    if operator is None or value in (None, ""):
+        return record
+    try:
+        keep = operator(_field(record, node.config.get("condition")), value)
+    except (TypeError, ValueError):
+        keep = False
+    return record if keep else DROP
+
+
+TRANSFORM_OPERATIONS: Dict[str, Callable[[Any], Any]] = {
+    "uppercase": lambda value: str(value).upper(),
+    "lowercase": lambda value: str(value).lower(),
+    "trim": lambda value: str(value).strip(),
+}
+
+
+@register_node_handler("transform")
+async def transform_handler(node: ExecutionNode, record: Any) -> Any:
+    """Apply a named operation; `map` extracts the field named by `expression`"""
+    operation = node.config.get("operation") or "map"
+    if operation == "map":
+        return _field(record, node.config.get("expression"))
+    transform = TRANSFORM_OPERATIONS.get(operation)
+    return transform(record) if transform else record
+
+
+MATH_OPERATIONS: Dict[str, Callable[[float, float], float]] = {
+    "add": lambda a, b: a + b,
+    "subtract": lambda a, b: a - b,
+    "multiply": lambda a, b: a * b,
+    "divide": lambda a, b: a / b,
+}
+
+
+@register_node_handler("math")
+async def math_handler(node: ExecutionNode, record: Any) -> Any:
+    """Combine a numeric record with `operandB`"""
+    operation = MATH_OPERATIONS.get(node.config.get("operation") or "add")
+    if operation is None:
+        return record
+    return operation(float(record), float(node.config.get("operandB") or 0))
+
+
+def _int_config(node: ExecutionNode, key: str, default: int) -> int:
+    try:
+        return max(int(node.config.get(key) or default), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def _parse_headers(headers: Any) -> Dict[str, str]:
+    """Headers arrive from the editor as a dict, a JSON object or `Name: value` lines"""
+    if isinstance(headers, dict):
+        return {str(key): str(value) for key, value in headers.items()}
+    if not headers:
+        return {}
+    try:
+        parsed = json.loads(headers)
+        if isinstance(parsed, dict):
+            return {str(key): str(value) for key, value in parsed.items()}
+    except ValueError:
+        pass
+    result = {}
+    for line in str(headers).splitlines():
+        name, sep, value = line.partition(":")
+        if sep:
+            result[name.strip()] = value.strip()
+    return result
+
+
+def _response_body(response: Any) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+@register_node_handler("api")
+async def api_handler(node: ExecutionNode, record: Any) -> Any:
+    """
+    Call the node's URL for the record through the shared I/O pools. With
+    `batchSize` > 1 records are coalesced into JSON-array requests (POST, PUT
+    or PATCH, with the node's headers) to a fixed `bulkUrl` (or `url`)
+    """
+    io = get_io_manager()
+    limit = _int_config(node, "ioConcurrency", DEFAULT_NODE_CONCURRENCY)
+    method = (node.config.get("method") or "GET").upper()
+    headers = _parse_headers(node.config.get("headers"))
+
+    batch_size = _int_config(node, "batchSize", 1)
+    if batch_size > 1:
+        # One URL per batch: a per-record template would defeat coalescing
+        bulk_url = node.config.get("bulkUrl") or node.config.get("url")
+        if not bulk_url:
+            raise ValueError("API node has no url configured")
+        if TEMPLATE_VARIABLE.search(bulk_url):
+            raise ValueError("Batched API nodes need a fixed bulkUrl without {{ variables }}")
+        return await io.bulk_request(node.id, bulk_url, record, method=method, headers=headers,
+                                     max_batch_size=batch_size,
+                                     max_wait=float(node.config.get("batchWait") or DEFAULT_BATCH_WAIT),
+                                     limit=limit)
+
+    url = render_template(node.config.get("url") or "", record)
+    if not url:
+        raise ValueError("API node has no url configured")
+    kwargs: Dict[str, Any] = {"headers": headers}
+    body = node.config.get("body")
+    if method in ("GET", "DELETE"):
+        if isinstance(record, dict):
+            kwargs["params"] = record
+    elif body:
+        kwargs["content"] = render_template(body, record)
+    else:
+        kwargs["json"] = record
+    response = await io.request(node.id, method, url, limit=limit, **kwargs)
+    return _response_body(response)
+
+
+@register_node_handler("database")
+async def database_handler(node: ExecutionNode, record: Any) -> Any:
+    """
+    Run the node's query with the record as parameters on the pool for `dsn`.
+    With `batchSize` > 1 concurrent records are coalesced (executemany for writes)
+    """
+    dsn = node.config.get("dsn")
+    query = node.config.get("query")
+    if not dsn or not query:
+        raise ValueError("Database node needs both dsn and query configured")
+    return await get_io_manager().query(
+        node.id, dsn, query, query_params(record),
+        max_batch_size=_int_config(node, "batchSize", 1),
+        max_wait=float(node.config.get("batchWait") or DEFAULT_BATCH_WAIT),
+        limit=_int_config(node, "ioConcurrency", DEFAULT_NODE_CONCURRENCY),
+    )
+
+
+def _llm_prompt(node: ExecutionNode, record: Any) -> str:
+    """Render the prompt from the node's template, or the record's prompt/context inputs"""
+    template = node.config.get("prompt")
+    if template:
+        return render_template(template, record)
+    if isinstance(record, dict):
+        parts = [record.get("prompt"), record.get("context")]
+        rendered = "\n\n".join(str(part) for part in parts if part)
+        return rendered or json.dumps(record, sort_keys=True, default=str)
+    return str(record)
+
+
+@register_node_handler("llm")
+async def llm_handler(node: ExecutionNode, record: Any) -> Any:
+    """Complete the rendered prompt through the shared batching, caching LLM client"""
+    params = {
+        "temperature": node.config.get("temperature"),
+        "maxTokens": node.config.get("maxTokens"),
+        "systemPrompt": node.config.get("systemPrompt") or "",
+    }
+    model = node.config.get("model") or "gpt-3.5-turbo"
+    return await get_llm_client().complete(model, _llm_prompt(node, record), params)
@@ -17,6 +17,7 @@ class PipelineAnalyzer:
     def reset(self):
         """Reset internal state for new analysis"""
         self.nodes: Set[str] = set()
+        self.node_order: List[str] = []  # Insertion order, so traversals are reproducible
         self.edges: List[Tuple[str, str]] = []
         self.adjacency_list: Dict[str, List[str]] = defaultdict(list)
         self.in_degree: Dict[str, int] = defaultdict(int)
@@ -69,19 +70,33 @@ class PipelineAnalyzer:
     
     def _build_graph(self, nodes: List[NodeData], edges: List[EdgeData]):
         """Build internal graph representation"""
+        self.build_graph([node.id for node in nodes], [(edge.source, edge.target) for edge in edges])
+    
+    def build_graph(self, node_ids: List[str], edges: List[Tuple[str, str]]):
+        """
+        Build the graph from plain node IDs and (source, target) pairs, for
+        callers that do not hold NodeData/EdgeData models (call reset() first
+        to start from an empty graph)
+        
+        Args:
+            node_ids: Node IDs
+            edges: (source, target) pairs; edges to unknown nodes are skipped
+        """
         logger.info("Building graph representation")
         
         # Add all nodes
-        for node in nodes:
-            self.nodes.add(node.id)
-            self.in_degree[node.id] = 0  # Initialize in-degree
-            self.out_degree[node.id] = 0  # Initialize out-degree
+        for node_id in node_ids:
+            if node_id not in self.nodes:
+                self.node_order.append(node_id)
+            self.nodes.add(node_id)
+            self.in_degree[node_id] = 0  # Initialize in-degree
+            self.out_degree[node_id] = 0  # Initialize out-degree
             
-        logger.info(f"Added {len(nodes)} nodes: {list(self.nodes)}")
+        logger.info(f"Added {len(node_ids)} nodes")
+        logger.debug("Nodes: %s", self.nodes)
         
         # Add all edges and build adjacency list
-        for edge in edges:
-            source, target = edge.source, edge.target
+        for source, target in edges:
             
             # Validate edge references existing nodes
             if source not in self.nodes:
@@ -99,8 +114,8 @@ class PipelineAnalyzer:
             self.out_degree[source] += 1
         
         logger.info(f"Added {len(self.edges)} valid edges")
-        logger.info(f"Adjacency list: {dict(self.adjacency_list)}")
-        logger.info(f"In-degrees: {dict(self.in_degree)}")
+        logger.debug("Adjacency list: %s", self.adjacency_list)
+        logger.debug("In-degrees: %s", self.in_degree)
         
     def _is_dag_kahns_algorithm(self) -> bool:
         """
@@ -120,31 +135,31 @@ class PipelineAnalyzer:
         
         # Initialize queue with nodes having no incoming edges
         queue = deque([
-            node for node in self.nodes 
+            node for node in self.node_order 
             if working_in_degree[node] == 0
         ])
         
         processed_nodes = 0
         topological_order = []
         
-        logger.info(f"Starting with {len(queue)} nodes with in-degree 0: {list(queue)}")
+        logger.info(f"Starting with {len(queue)} nodes with in-degree 0")
         
         while queue:
             current_node = queue.popleft()
             processed_nodes += 1
             topological_order.append(current_node)
             
-            logger.debug(f"Processing node: {current_node}")
+            logger.debug("Processing node: %s", current_node)
             
             # Process all outgoing edges
             for neighbor in self.adjacency_list[current_node]:
                 working_in_degree[neighbor] -= 1
-                logger.debug(f"  Reduced in-degree of {neighbor} to {working_in_degree[neighbor]}")
+                logger.debug("  Reduced in-degree of %s to %s", neighbor, working_in_degree[neighbor])
                 
                 # If in-degree becomes 0, add to queue
                 if working_in_degree[neighbor] == 0:
                     queue.append(neighbor)
-                    logger.debug(f"  Added {neighbor} to queue")
+                    logger.debug("  Added %s to queue", neighbor)
         
         is_dag = processed_nodes == len(self.nodes)
         
@@ -152,7 +167,7 @@ class PipelineAnalyzer:
         logger.info(f"  Total nodes: {len(self.nodes)}")
         logger.info(f"  Processed nodes: {processed_nodes}")
         logger.info(f"  Is DAG: {is_dag}")
-        logger.info(f"  Topological order: {topological_order}")
+        logger.debug("  Topological order: %s", topological_order)
         
         if not is_dag:
             remaining_nodes = [
@@ -232,7 +247,7 @@ class PipelineAnalyzer:
         # Re-run Kahn's algorithm to get the ordering
         working_in_degree = self.in_degree.copy()
         queue = deque([
-            node for node in self.nodes 
+            node for node in self.node_order 
             if working_in_degree[node] == 0
         ])
         
@@ -249,6 +264,29 @@ class PipelineAnalyzer:
         
         return topological_order
     
+    def get_topological_levels(self) -> Optional[Dict[str, int]]:
+        """
+        Get the longest-path level of every node (only valid for DAGs)
+        
+        Sources sit on level 0 and every other node one level below its
+        deepest parent, so each edge points to a strictly higher level.
+        
+        Returns:
+            Mapping of node ID to level, or None if not a DAG
+        """
+        topological_order = self.get_topological_order()
+        if topological_order is None:
+            return None
+        
+        levels = {node: 0 for node in topological_order}
+        for node in topological_order:
+            next_level = levels[node] + 1
+            for neighbor in self.adjacency_list[node]:
+                if levels[neighbor] < next_level:
+                    levels[neighbor] = next_level
+        
+        return levels
+    
     def get_graph_statistics(self) -> Dict[str, any]:
         """Get detailed graph statistics"""
         if not self.nodes:
@@ -0,0 +1,262 @@
+# backend/pipeline_checkpoint.py
+from typing import Any, Dict, Iterator, List, Optional
+import gzip
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+COMPRESS_LEVEL = 1
+
+
+def _file_name(stage_id: str) -> str:
+    # Stage IDs come from the editor and may contain path separators
+    return hashlib.sha1(stage_id.encode("utf-8")).hexdigest()[:20] + ".pkl.gz"
+
+
+def read_records(path: str) -> Iterator[Any]:
+    """Stream records back from a gzip'd sequence of pickles"""
+    with gzip.open(path, "rb") as handle:
+        while True:
+            try:
+                yield pickle.load(handle)
+            except EOFError:
+                return
+
+
+class CheckpointStore:
+    """
+    On-disk store of completed stage outputs for one run.
+
+    Each stage's output is a gzip'd stream of pickled records written to a
+    temporary file and renamed into place once the stage finishes, and the
+    manifest lists completed stages in topological order together with a
+    fingerprint of the pipeline and a digest of the input they were computed
+    for.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, stage_id: str) -> str:
+        return os.path.join(self.directory, _file_name(stage_id))
+
+    def _manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.directory, MANIFEST_FILE), "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {}
+
+    def completed_stages(self, fingerprint: str) -> List[str]:
+        """Completed stage IDs, or [] if there is no manifest or it is for another pipeline"""
+        manifest = self._manifest()
+        if not manifest:
+            return []
+        if manifest.get("fingerprint") != fingerprint:
+            logger.warning(f"Checkpoint in {self.directory} is for a different pipeline - ignoring it")
+            return []
+        return [stage_id for stage_id in manifest.get("completed", []) if os.path.exists(self.path(stage_id))]
+
+    def input_digest(self) -> Optional[str]:
+        """Digest of the input the checkpointed stages were computed from"""
+        return self._manifest().get("input_digest")
+
+    def save_manifest(self, fingerprint: str, completed: List[str], input_digest: Optional[str] = None):
+        manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        temporary = manifest_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump({"fingerprint": fingerprint, "input_digest": input_digest, "completed": completed}, handle)
+        os.replace(temporary, manifest_path)
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+
+class _ResultWriter:
+    """Collects one stage's output, in memory while the cap allows and on disk otherwise"""
+
+    def __init__(self, store: "ResultStore", stage_id: str, final_path: Optional[str], digest: bool = False):
+        self.store = store
+        self.stage_id = stage_id
+        self.final_path = final_path
+        self.buffer: Optional[List[Any]] = []
+        self.buffered_bytes = 0
+        self.count = 0
+        self.committed = False
+        self.readers = 0
+        self._digest = hashlib.sha256() if digest else None
+        self._handle = None
+        self._temporary: Optional[str] = None
+        if final_path is not None:
+            self._open(final_path)
+
+    def _open(self, final_path: str):
+        self.final_path = final_path
+        self._temporary = final_path + ".tmp"
+        self._handle = gzip.open(self._temporary, "wb", compresslevel=COMPRESS_LEVEL)
+
+    def append(self, record: Any):
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        self.count += 1
+        if self._digest is not None:
+            self._digest.update(data)
+        if self._handle is not None:
+            self._handle.write(data)
+        if self.buffer is None:
+            return
+        if self.store.reserve(len(data), exclude=self.stage_id):
+            self.buffer.append(record)
+            self.buffered_bytes += len(data)
+        else:
+            already_on_disk = self._handle is not None
+            self.spill()
+            if not already_on_disk:
+                self._handle.write(data)
+
+    @property
+    def digest(self) -> Optional[str]:
+        """sha256 over the pickled records appended so far, if requested"""
+        return self._digest.hexdigest() if self._digest is not None else None
+
+    def spill(self):
+        """
+        Move the buffered records to disk and stop buffering. Records already
+        written to a checkpoint file (committed or still being written) are
+        not written again: only the in-memory copy is dropped
+        """
+        if self.buffer is None:
+            return
+        if self.final_path is None:
+            self._open(self.store.spill_path(self.stage_id))
+            for record in self.buffer:
+                self._handle.write(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+            if self.committed:
+                self._close()
+                self.store.completed(self)
+        self.store.free(self.buffered_bytes)
+        self.store.spilled.add(self.stage_id)
+        self.buffer = None
+        self.buffered_bytes = 0
+
+    def _close(self):
+        if self._handle is not None:
+            self._handle.close()
+            os.replace(self._temporary, self.final_path)
+            self._handle = None
+
+    def commit(self):
+        self._close()
+        self.committed = True
+        self.store.completed(self)
+
+    def abort(self):
+        if self._handle is not None:
+            self._handle.close()
+            os.remove(self._temporary)
+            self._handle = None
+        self.store.free(self.buffered_bytes)
+
+
+class ResultStore:
+    """
+    Intermediate stage results under a memory cap.
+
+    Results are kept in memory while the running total of their pickled
+    sizes stays under `memory_limit`. When a new record does not fit, other
+    completed results are spilled (largest first) and, failing that, the
+    stage being written spills itself. Results that are being read are never
+    spilled, since their readers keep the records alive anyway. Results that
+    are also checkpointed are spilled by just dropping the in-memory copy.
+    """
+
+    def __init__(self, checkpoints: Optional[CheckpointStore] = None, memory_limit: Optional[int] = None):
+        self.checkpoints = checkpoints
+        self.memory_limit = memory_limit
+        self.buffered_bytes = 0
+        self.peak_buffered_bytes = 0
+        self.spilled = set()
+        self._results: Dict[str, _ResultWriter] = {}
+        self._disk: Dict[str, str] = {}
+        self._spill_dir: Optional[str] = None
+
+    def spill_path(self, stage_id: str) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="pipeline-spill-")
+        return os.path.join(self._spill_dir, _file_name(stage_id))
+
+    def reserve(self, size: int, exclude: Optional[str] = None) -> bool:
+        """Account for `size` more buffered bytes, spilling other results if needed"""
+        if self.memory_limit is not None and self.buffered_bytes + size > self.memory_limit:
+            candidates = sorted(
+                (writer for stage_id, writer in self._results.items()
+                 if stage_id != exclude and writer.buffer is not None and not writer.readers),
+                key=lambda writer: writer.buffered_bytes,
+                reverse=True,
+            )
+            for writer in candidates:
+                writer.spill()
+                if self.buffered_bytes + size <= self.memory_limit:
+                    break
+            if self.buffered_bytes + size > self.memory_limit:
+                return False
+        self.buffered_bytes += size
+        self.peak_buffered_bytes = max(self.peak_buffered_bytes, self.buffered_bytes)
+        return True
+
+    def free(self, size: int):
+        self.buffered_bytes -= size
+
+    def writer(self, stage_id: str, digest: bool = False) -> _ResultWriter:
+        final_path = self.checkpoints.path(stage_id) if self.checkpoints is not None else None
+        return _ResultWriter(self, stage_id, final_path, digest)
+
+    def completed(self, writer: _ResultWriter):
+        self._results[writer.stage_id] = writer
+        if writer.final_path is not None:
+            self._disk[writer.stage_id] = writer.final_path
+
+    def restore(self, stage_id: str):
+        """Register a checkpointed result from an earlier run (read lazily from disk)"""
+        self._disk[stage_id] = self.checkpoints.path(stage_id)
+
+    def read(self, stage_id: str) -> Iterator[Any]:
+        writer = self._results.get(stage_id)
+        if writer is not None and writer.buffer is not None:
+            return self._read_buffer(writer)
+        return read_records(self._disk[stage_id])
+
+    def _read_buffer(self, writer: _ResultWriter) -> Iterator[Any]:
+        # Pinned while iterated, so the count of buffered bytes stays truthful
+        writer.readers += 1
+        try:
+            yield from writer.buffer
+        finally:
+            writer.readers -= 1
+
+    def release(self, stage_id: str):
+        """Drop a result nobody will read again; checkpoint files are kept"""
+        writer = self._results.pop(stage_id, None)
+        if writer is not None and writer.buffer is not None:
+            self.free(writer.buffered_bytes)
+            writer.buffer = None
+        path = self._disk.get(stage_id)
+        if path is not None and self._spill_dir is not None and path.startswith(self._spill_dir):
+            os.remove(path)
+            del self._disk[stage_id]
+
+    def close(self):
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+        self._results.clear()
+        self._disk.clear()
+        self.buffered_bytes = 0
@@ -0,0 +1,523 @@
+# backend/pipeline_executor.py
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from models import NodeData, EdgeData
+from node_handlers import DROP, ExecutionNode, NodeHandler, PipelineExecutionError, get_node_handler
+from pipeline_analyzer import PipelineAnalyzer
+from pipeline_checkpoint import CheckpointStore, ResultStore
+from pipeline_fusion import FusedNode, compile_plan, fused_handler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 64
+
+# Pseudo-stage holding the run's input records, checkpointed like any other
+INPUT_STAGE = "__input__"
+
+# End-of-stream marker sent once along every edge when a stage finishes
+_EOS = object()
+
+
+def _max_rss_kb() -> int:
+    """Process peak RSS in KB (ru_maxrss is in bytes on macOS, KB elsewhere)"""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class _Failure:
+    """Carries a stage exception to the consumer of the sink queue"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class StageMetrics:
+    """Throughput and per-record latency counters for one stage (constant memory)"""
+
+    def __init__(self, node_id: str, node_ids: Optional[List[str]] = None):
+        self.node_id = node_id
+        self.node_ids = node_ids or [node_id]
+        self.records_in = 0
+        self.records_out = 0
+        self.dropped = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def observe(self, latency: float):
+        """Record the handler latency of one record"""
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = 0.0
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            "nodes": self.node_ids,
+            "records_in": self.records_in,
+            "records_out": self.records_out,
+            "dropped": self.dropped,
+            "elapsed_s": elapsed,
+            "throughput_per_s": self.records_out / elapsed if elapsed > 0 else 0.0,
+            "avg_latency_ms": 1000 * self.total_latency / self.records_in if self.records_in else 0.0,
+            "max_latency_ms": 1000 * self.max_latency,
+        }
+
+
+class _PlannedExecutor:
+    """Shared set-up of the executors: analysis, stage plan, handlers and metrics"""
+
+    def __init__(self, nodes: List[NodeData], edges: List[EdgeData],
+                 handlers: Optional[Dict[str, NodeHandler]] = None,
+                 fuse: bool = True):
+        analyzer = PipelineAnalyzer()
+        analysis = analyzer.analyze_pipeline(nodes, edges)
+        if not analysis["is_dag"]:
+            raise ValueError("Pipeline contains cycles and cannot be executed")
+
+        self.nodes: Dict[str, ExecutionNode] = {node.id: ExecutionNode.from_node(node) for node in nodes}
+        self.plan = compile_plan(
+            analyzer.get_topological_order(),
+            analyzer.adjacency_list,
+            analyzer.in_degree,
+            analyzer.out_degree,
+            self.nodes,
+            fuse,
+        )
+        self.order: List[str] = self.plan.order
+        self.children: Dict[str, List[str]] = self.plan.children
+        self.in_degree: Dict[str, int] = self.plan.in_degree
+        self.sources = [stage_id for stage_id in self.order if self.in_degree[stage_id] == 0]
+        self.sinks = [stage_id for stage_id in self.order if not self.children[stage_id]]
+        self.handlers = handlers or {}
+        self.metrics: Dict[str, StageMetrics] = {}
+
+    def _handler(self, node: ExecutionNode) -> NodeHandler:
+        if isinstance(node, FusedNode):
+            return fused_handler([self._handler(step) for step in node.steps])
+        return self.handlers.get(node.type) or get_node_handler(node.type)
+
+    async def _invoke(self, handler: NodeHandler, node: ExecutionNode, record: Any, metrics: StageMetrics) -> Any:
+        """Run the handler on one record, timing it and tagging failures with the node ID"""
+        metrics.records_in += 1
+        started = time.perf_counter()
+        if metrics.started_at is None:
+            # Clock starts at the first record, not while waiting on upstream
+            metrics.started_at = started
+        try:
+            result = await handler(node, record)
+        except PipelineExecutionError:
+            raise
+        except Exception as e:
+            raise PipelineExecutionError(node.id, e) from e
+        metrics.observe(time.perf_counter() - started)
+        if result is DROP:
+            metrics.dropped += 1
+        else:
+            metrics.records_out += 1
+        return result
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage throughput and latency of the most recent run"""
+        return {stage_id: metrics.to_dict() for stage_id, metrics in self.metrics.items()}
+
+
+class StreamingExecutor(_PlannedExecutor):
+    """
+    Record-at-a-time pipeline execution.
+
+    Every node of the analyzed DAG becomes an async generator stage; stages are
+    connected by bounded queues along the graph's edges. A stage's output is
+    broadcast to all of its children (fan-out) and a stage with several parents
+    consumes their records interleaved until each parent has signalled
+    end-of-stream (fan-in). Because every queue is bounded, a slow stage blocks
+    its parents' puts and backpressure propagates all the way to the source
+    iterator, keeping memory constant regardless of input size.
+
+    Linear chains (single-output node feeding a single-input node) are fused
+    into one stage by default, so records move between their steps as plain
+    function calls instead of queue hops. Metrics are reported per stage and
+    list the original node IDs each stage runs.
+    """
+
+    def __init__(self, nodes: List[NodeData], edges: List[EdgeData],
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 handlers: Optional[Dict[str, NodeHandler]] = None,
+                 fuse: bool = True):
+        """
+        Args:
+            nodes: Pipeline nodes (models.NodeData or main.PipelineNode)
+            edges: Pipeline edges
+            queue_size: Capacity of every inter-stage queue
+            handlers: Optional per-node-type overrides of the registered handlers
+            fuse: Fuse linear chains into single stages
+        """
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        super().__init__(nodes, edges, handlers, fuse)
+        self.queue_size = queue_size
+
+    async def _stage(self, node: ExecutionNode, inbox: asyncio.Queue, num_parents: int) -> AsyncIterator[Any]:
+        """Async generator yielding the node's output records, one input at a time"""
+        handler = self._handler(node)
+        metrics = self.metrics[node.id]
+        remaining = num_parents
+        while remaining:
+            record = await inbox.get()
+            if record is _EOS:
+                remaining -= 1
+                continue
+            result = await self._invoke(handler, node, record, metrics)
+            if result is not DROP:
+                yield result
+
+    async def _concurrent_stage(self, node: ExecutionNode, inbox: asyncio.Queue, num_parents: int) -> AsyncIterator[Any]:
+        """
+        Like _stage but keeps up to node.concurrency records in flight, yielding
+        results in completion order. Used for I/O-bound nodes
+        """
+        handler = self._handler(node)
+        metrics = self.metrics[node.id]
+        limit = node.concurrency
+        remaining = num_parents
+        pending: Set[asyncio.Future] = set()
+        getter: Optional[asyncio.Future] = None
+        try:
+            while remaining or pending:
+                if remaining and getter is None and len(pending) < limit:
+                    getter = asyncio.ensure_future(inbox.get())
+                waiting = set(pending)
+                if getter is not None:
+                    waiting.add(getter)
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if getter is not None and getter in done:
+                    record = getter.result()
+                    getter = None
+                    if record is _EOS:
+                        remaining -= 1
+                    else:
+                        pending.add(asyncio.ensure_future(self._invoke(handler, node, record, metrics)))
+
+                for task in done & pending:
+                    pending.discard(task)
+                    result = task.result()
+                    if result is not DROP:
+                        yield result
+        finally:
+            for task in pending | ({getter} if getter is not None else set()):
+                task.cancel()
+
+    async def _pump(self, stage_id: str, stage: AsyncIterator[Any], outboxes: List[asyncio.Queue],
+                    sink_id: Optional[str] = None):
+        """
+        Drive a stage, pushing each output to every child queue (awaiting = backpressure).
+        Sink stages tag their records with the original sink node ID
+        """
+        metrics = self.metrics[stage_id]
+        async for record in stage:
+            item = (sink_id, record) if sink_id is not None else record
+            for queue in outboxes:
+                await queue.put(item)
+        for queue in outboxes:
+            await queue.put(_EOS)
+        metrics.finished_at = time.perf_counter()
+
+    async def _feed(self, records: Union[Iterable[Any], AsyncIterable[Any]], inboxes: List[asyncio.Queue]):
+        """Broadcast source records to every source stage"""
+        if hasattr(records, "__aiter__"):
+            async for record in records:
+                for queue in inboxes:
+                    await queue.put(record)
+        else:
+            for record in records:
+                for queue in inboxes:
+                    await queue.put(record)
+        for queue in inboxes:
+            await queue.put(_EOS)
+
+    async def _guard(self, coro, tasks: List[asyncio.Task], sink_queue: asyncio.Queue):
+        """On failure, stop every other task and hand the error to the consumer"""
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            current = asyncio.current_task()
+            for task in tasks:
+                if task is not current:
+                    task.cancel()
+            await sink_queue.put(_Failure(e))
+
+    async def run(self, records: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream records through the pipeline
+
+        Args:
+            records: Sync or async iterable fed to every source node; may be unbounded
+
+        Yields:
+            (sink_node_id, record) pairs as they leave the sink nodes
+        """
+        self.metrics = {stage_id: StageMetrics(stage_id, self.plan.node_ids(stage_id)) for stage_id in self.order}
+        inboxes = {stage_id: asyncio.Queue(self.queue_size) for stage_id in self.order}
+        sink_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        tasks: List[asyncio.Task] = []
+
+        logger.info(f"Starting streaming run over {len(self.order)} stages "
+                    f"({len(self.sources)} sources, {len(self.sinks)} sinks)")
+
+        def spawn(coro):
+            tasks.append(asyncio.ensure_future(self._guard(coro, tasks, sink_queue)))
+
+        spawn(self._feed(records, [inboxes[stage_id] for stage_id in self.sources]))
+        for stage_id in self.order:
+            node = self.plan.stages[stage_id]
+            num_parents = self.in_degree[stage_id] or 1
+            stage_factory = self._concurrent_stage if node.concurrency > 1 else self._stage
+            stage = stage_factory(node, inboxes[stage_id], num_parents)
+            children = self.children[stage_id]
+            if children:
+                spawn(self._pump(stage_id, stage, [inboxes[child] for child in children]))
+            else:
+                spawn(self._pump(stage_id, stage, [sink_queue], sink_id=self.plan.node_ids(stage_id)[-1]))
+
+        remaining_sinks = len(self.sinks)
+        try:
+            while remaining_sinks:
+                item = await sink_queue.get()
+                if item is _EOS:
+                    remaining_sinks -= 1
+                elif isinstance(item, _Failure):
+                    raise item.error
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"Streaming run finished: {self.get_metrics()}")
+
+
+class PipelineExecutor(_PlannedExecutor):
+    """
+    Batch pipeline execution with checkpoints and a memory cap.
+
+    Stages run one after another in topological order, each consuming the
+    full output of its parents. With a `checkpoint_dir`, the input and every
+    completed stage output are written to an on-disk CheckpointStore and the
+    manifest is updated after each stage, so a failed or interrupted run
+    resumes from its last completed frontier instead of starting over.
+    Intermediate results stay in memory only while they fit `memory_limit`
+    and are spilled to disk otherwise; results are dropped as soon as their
+    last consumer has run.
+    """
+
+    def __init__(self, nodes: List[NodeData], edges: List[EdgeData],
+                 checkpoint_dir: Optional[str] = None,
+                 memory_limit: Optional[int] = None,
+                 handlers: Optional[Dict[str, NodeHandler]] = None,
+                 fuse: bool = True):
+        """
+        Args:
+            nodes: Pipeline nodes (models.NodeData or main.PipelineNode)
+            edges: Pipeline edges
+            checkpoint_dir: Directory holding one checkpoint sub-directory per run
+            memory_limit: Cap in bytes (pickled size) on buffered intermediate results
+            handlers: Optional per-node-type overrides of the registered handlers
+            fuse: Fuse linear chains into single stages
+        """
+        super().__init__(nodes, edges, handlers, fuse)
+        self.checkpoint_dir = checkpoint_dir
+        self.memory_limit = memory_limit
+        self.parents: Dict[str, List[str]] = {stage_id: [] for stage_id in self.order}
+        for stage_id in self.order:
+            for child in self.children[stage_id]:
+                self.parents[child].append(stage_id)
+        self.fingerprint = self._fingerprint()
+        self._store: Optional[ResultStore] = None
+
+    def _fingerprint(self) -> str:
+        """
+        Hash of the node configs and stage graph, so checkpoints are never
+        reused for another pipeline. Built from a sorted canonical form so it
+        does not depend on node, edge or traversal order
+        """
+        payload = json.dumps({
+            "nodes": sorted([node.id, node.type, node.config] for node in self.nodes.values()),
+            "stages": sorted([stage_id, sorted(self.children[stage_id])] for stage_id in self.order),
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _run_stage(self, node: ExecutionNode, inputs: Iterator[Any], writer) -> None:
+        """Apply the stage to every input, keeping up to node.concurrency records in flight"""
+        handler = self._handler(node)
+        metrics = self.metrics[node.id]
+        metrics.started_at = time.perf_counter()
+        window = node.concurrency
+        if window == 1:
+            for record in inputs:
+                result = await self._invoke(handler, node, record, metrics)
+                if result is not DROP:
+                    writer.append(result)
+        else:
+            batch: List[Any] = []
+            for record in inputs:
+                batch.append(record)
+                if len(batch) == window:
+                    for result in await asyncio.gather(*(self._invoke(handler, node, r, metrics) for r in batch)):
+                        if result is not DROP:
+                            writer.append(result)
+                    batch = []
+            for result in await asyncio.gather(*(self._invoke(handler, node, r, metrics) for r in batch)):
+                if result is not DROP:
+                    writer.append(result)
+        metrics.finished_at = time.perf_counter()
+
+    async def run(self, records: Optional[Iterable[Any]] = None, run_id: Optional[str] = None,
+                  resume: bool = True) -> Dict[str, Any]:
+        """
+        Execute the pipeline over a finite batch of records
+
+        Args:
+            records: Input records fed to every source node; may be omitted when
+                resuming a run whose input was already checkpointed. Checkpointed
+                stages computed from different records are not reused
+            run_id: Checkpoint name; defaults to a prefix of the pipeline fingerprint
+            resume: Reuse completed stages from an earlier run with the same run_id
+
+        Returns:
+            Run report with resumed/executed stages, resume time, elapsed time,
+            peak buffered bytes and how far the run raised the process's peak
+            RSS. Sink outputs are read with outputs()
+        """
+        started = time.perf_counter()
+        start_rss = _max_rss_kb()
+        run_id = run_id or self.fingerprint[:16]
+        self.close()
+
+        checkpoints = None
+        done: Set[str] = set()
+        input_digest = None
+        if self.checkpoint_dir:
+            checkpoints = CheckpointStore(os.path.join(self.checkpoint_dir, run_id))
+            if resume:
+                done = set(checkpoints.completed_stages(self.fingerprint))
+                input_digest = checkpoints.input_digest()
+            if not done:
+                checkpoints.clear()
+        store = self._store = ResultStore(checkpoints, self.memory_limit)
+
+        # Records passed in are always (re)written; checkpointed stages are only
+        # reused when they were computed from the same input
+        input_s = 0.0
+        if records is not None:
+            input_started = time.perf_counter()
+            writer = store.writer(INPUT_STAGE, digest=checkpoints is not None)
+            for record in records:
+                writer.append(record)
+            if done and writer.digest != input_digest:
+                logger.info(f"Input for run {run_id} changed - starting over")
+                done = set()
+                checkpoints.save_manifest(self.fingerprint, [])
+            input_digest = writer.digest
+            writer.commit()
+            input_s = time.perf_counter() - input_started
+        elif INPUT_STAGE not in done:
+            raise ValueError(f"No checkpointed input for run {run_id}; records are required")
+
+        # Resume from the completed prefix of the topological order (the frontier)
+        completed = [INPUT_STAGE]
+        for stage_id in self.order:
+            if stage_id not in done:
+                break
+            completed.append(stage_id)
+        for stage_id in completed:
+            if records is None or stage_id != INPUT_STAGE:
+                store.restore(stage_id)
+        if checkpoints is not None:
+            checkpoints.save_manifest(self.fingerprint, completed, input_digest)
+        resume_s = time.perf_counter() - started - input_s
+        if len(completed) > 1:
+            logger.info(f"Resuming run {run_id}: {len(completed) - 1} completed stages restored in {resume_s * 1000:.1f} ms")
+
+        self.metrics = {stage_id: StageMetrics(stage_id, self.plan.node_ids(stage_id)) for stage_id in self.order}
+        pending_reads = {stage_id: len(self.children[stage_id]) for stage_id in self.order}
+        pending_reads[INPUT_STAGE] = len(self.sources)
+
+        def checkpoint(stage_id: str):
+            completed.append(stage_id)
+            if checkpoints is not None:
+                checkpoints.save_manifest(self.fingerprint, completed, input_digest)
+
+        def consumed(stage_id: str):
+            pending_reads[stage_id] -= 1
+            if pending_reads[stage_id] == 0:
+                store.release(stage_id)
+
+        executed = []
+        for stage_id in self.order:
+            if stage_id in completed:
+                continue
+            parents = self.parents[stage_id] or [INPUT_STAGE]
+            inputs = (record for parent in parents for record in store.read(parent))
+            writer = store.writer(stage_id)
+            try:
+                await self._run_stage(self.plan.stages[stage_id], inputs, writer)
+            except BaseException:
+                writer.abort()
+                self.close()
+                logger.error(f"Run {run_id} failed at stage {stage_id}; "
+                             f"{len(completed)} completed stages are checkpointed")
+                raise
+            writer.commit()
+            checkpoint(stage_id)
+            executed.append(stage_id)
+            for parent in parents:
+                consumed(parent)
+
+        report = {
+            "run_id": run_id,
+            "stages_resumed": [stage_id for stage_id in completed if stage_id not in executed and stage_id != INPUT_STAGE],
+            "stages_executed": executed,
+            "resume_s": resume_s,
+            "elapsed_s": time.perf_counter() - started,
+            "peak_buffered_bytes": store.peak_buffered_bytes,
+            "memory_limit": self.memory_limit,
+            "spilled_stages": sorted(store.spilled),
+            "peak_rss_growth_kb": _max_rss_kb() - start_rss if resource else None,
+        }
+        logger.info(f"Run {run_id} finished: {report}")
+        return report
+
+    def outputs(self, node_id: str) -> Iterator[Any]:
+        """Stream the records produced by a sink node in the most recent run"""
+        if self._store is None:
+            raise ValueError("Pipeline has not been run")
+        stage_id = self.plan.stage_of[node_id]
+        if stage_id not in self.sinks or self.plan.node_ids(stage_id)[-1] != node_id:
+            raise ValueError(f"Node {node_id} is not a sink node")
+        return self._store.read(stage_id)
+
+    def close(self):
+        """Drop buffered results and remove spill files (checkpoints are kept)"""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
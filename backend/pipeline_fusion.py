@@ -0,0 +1,137 @@
+# backend/pipeline_fusion.py
+from typing import Any, Dict, List
+import logging
+
+from node_handlers import DROP, ExecutionNode, NodeHandler, PipelineExecutionError
+
+logger = logging.getLogger(__name__)
+
+FUSED_NODE_TYPE = "fused"
+
+
+class FusedNode(ExecutionNode):
+    """
+    A linear chain of nodes compiled into a single execution stage. The stage
+    takes its head node's ID: node IDs are unique and every node belongs to
+    exactly one chain, so it cannot collide with another stage
+    """
+
+    def __init__(self, steps: List[ExecutionNode]):
+        super().__init__(steps[0].id, FUSED_NODE_TYPE)
+        self.steps = steps
+
+    @property
+    def node_ids(self) -> List[str]:
+        return [step.id for step in self.steps]
+
+    @property
+    def concurrency(self) -> int:
+        return 1
+
+
+class ExecutionPlan:
+    """
+    Stage graph produced from the analyzed DAG. Each stage is either an
+    original node or a FusedNode; `stage_of` maps every original node ID to
+    the stage that runs it
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, ExecutionNode] = {}
+        self.order: List[str] = []
+        self.children: Dict[str, List[str]] = {}
+        self.in_degree: Dict[str, int] = {}
+        self.stage_of: Dict[str, str] = {}
+
+    def node_ids(self, stage_id: str) -> List[str]:
+        """Original node IDs executed by a stage, in order"""
+        stage = self.stages[stage_id]
+        return stage.node_ids if isinstance(stage, FusedNode) else [stage.id]
+
+
+def _fusible(node: ExecutionNode) -> bool:
+    # Nodes that keep several records in flight need their own stage
+    return node.concurrency == 1
+
+
+def find_fusible_chains(order: List[str], children: Dict[str, List[str]],
+                        in_degree: Dict[str, int], out_degree: Dict[str, int],
+                        nodes: Dict[str, ExecutionNode]) -> List[List[str]]:
+    """
+    Split the DAG into maximal chains joined by fusible edges.
+
+    An edge u -> v is fusible when it is u's only outgoing edge and v's only
+    incoming edge, so no record ever needs to be broadcast or merged between
+    them. Walking nodes in topological order guarantees every chain is
+    started from its head.
+
+    Returns:
+        Chains in topological order of their heads; unfused nodes are
+        singleton chains
+    """
+    chains: List[List[str]] = []
+    seen = set()
+    for node_id in order:
+        if node_id in seen:
+            continue
+        chain = [node_id]
+        seen.add(node_id)
+        current = node_id
+        while out_degree[current] == 1 and _fusible(nodes[current]):
+            successor = children[current][0]
+            if in_degree[successor] != 1 or not _fusible(nodes[successor]):
+                break
+            chain.append(successor)
+            seen.add(successor)
+            current = successor
+        chains.append(chain)
+    return chains
+
+
+def compile_plan(order: List[str], children: Dict[str, List[str]],
+                 in_degree: Dict[str, int], out_degree: Dict[str, int],
+                 nodes: Dict[str, ExecutionNode], fuse: bool = True) -> ExecutionPlan:
+    """Build the stage graph, fusing linear chains unless `fuse` is False"""
+    if fuse:
+        chains = find_fusible_chains(order, children, in_degree, out_degree, nodes)
+    else:
+        chains = [[node_id] for node_id in order]
+
+    plan = ExecutionPlan()
+    for chain in chains:
+        stage = nodes[chain[0]] if len(chain) == 1 else FusedNode([nodes[node_id] for node_id in chain])
+        if stage.id in plan.stages:
+            raise ValueError(f"Duplicate stage ID {stage.id}")
+        plan.stages[stage.id] = stage
+        plan.order.append(stage.id)
+        for node_id in chain:
+            plan.stage_of[node_id] = stage.id
+
+    for stage_id in plan.order:
+        node_ids = plan.node_ids(stage_id)
+        plan.children[stage_id] = [plan.stage_of[child] for child in children[node_ids[-1]]]
+        plan.in_degree[stage_id] = in_degree[node_ids[0]]
+
+    fused = sum(1 for chain in chains if len(chain) > 1)
+    logger.info(f"Compiled {len(order)} nodes into {len(plan.order)} stages ({fused} fused chains)")
+    return plan
+
+
+def fused_handler(handlers: List[NodeHandler]) -> NodeHandler:
+    """
+    Compose per-step handlers into one stage handler. Records pass directly
+    from step to step; a DROP short-circuits the rest of the chain. Failures
+    are raised as PipelineExecutionError naming the original node
+    """
+    async def run(node: FusedNode, record: Any) -> Any:
+        for step, handler in zip(node.steps, handlers):
+            try:
+                record = await handler(step, record)
+            except PipelineExecutionError:
+                raise
+            except Exception as e:
+                raise PipelineExecutionError(step.id, e) from e
+            if record is DROP:
+                return DROP
+        return record
+    return run
@@ -0,0 +1,400 @@
+# backend/pipeline_io.py
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import sqlite3
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_NODE_CONCURRENCY = 4
+DEFAULT_BATCH_WAIT = 0.005
+
+READ_STATEMENTS = ("select", "with", "pragma", "explain")
+BULK_METHODS = ("POST", "PUT", "PATCH")
+
+
+async def _start(generator: AsyncIterator[None]):
+    await generator.__anext__()
+
+
+class LoopLocal:
+    """
+    One value per running event loop, for objects that bind to the loop they
+    were created on (clients, pools, locks, futures).
+
+    A value is dropped, and handed to `close` if given, when asyncio.run()
+    shuts its loop down: a watcher async generator is started on the loop,
+    and the loop finalises open async generators before closing. Values of
+    loops closed some other way are dropped on the next access from a new
+    loop.
+    """
+
+    def __init__(self, factory: Callable[[], Any],
+                 close: Optional[Callable[[Any], Awaitable[None]]] = None):
+        self.factory = factory
+        self.close = close
+        self._values: Dict[asyncio.AbstractEventLoop, Any] = {}
+        # The loop only keeps weak references to its async generators
+        self._watchers: Dict[asyncio.AbstractEventLoop, AsyncIterator[None]] = {}
+
+    def get(self) -> Any:
+        """Value of the running loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._values:
+            for closed in [other for other in self._values if other.is_closed()]:
+                del self._values[closed]
+                self._watchers.pop(closed, None)
+            self._values[loop] = self.factory()
+            watcher = self._watchers[loop] = self._watch(loop)
+            loop.create_task(_start(watcher))
+        return self._values[loop]
+
+    def pop(self) -> Any:
+        """Detach and return the running loop's value (None if it has none)"""
+        return self._values.pop(asyncio.get_running_loop(), None)
+
+    def values(self) -> List[Any]:
+        return list(self._values.values())
+
+    async def _watch(self, loop: asyncio.AbstractEventLoop) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            self._watchers.pop(loop, None)
+            value = self._values.pop(loop, None)
+            if value is not None and self.close is not None:
+                await self.close(value)
+
+
+class MicroBatcher:
+    """
+    Coalesce individual async calls into batches.
+
+    When no batch is in flight, items are flushed on the next loop
+    iteration, so everything submitted in the same tick is coalesced but a
+    lone caller (e.g. a node processing one record at a time) never waits.
+    While a batch is in flight, new items are buffered until `max_batch_size`
+    are waiting, the batch completes, or `max_wait` seconds have passed since
+    the first one. `flush` receives the items in a single call and must return
+    one result per item, in order. At most `max_concurrency` flushes run at
+    once.
+    """
+
+    def __init__(self, flush: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 32, max_wait: float = DEFAULT_BATCH_WAIT,
+                 max_concurrency: Optional[int] = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.flush = flush
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Handle] = None
+        self._tasks: set = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush_pending()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            if self._tasks:
+                self._timer = loop.call_later(self.max_wait, self._flush_pending)
+            else:
+                self._timer = loop.call_soon(self._flush_pending)
+        return await future
+
+    def _flush_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Future):
+        self._tasks.discard(task)
+        # Items that queued up behind the finished batch need not wait any longer
+        if self._pending and not self._tasks:
+            self._flush_pending()
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            if self._semaphore is not None:
+                async with self._semaphore:
+                    results = await self.flush(items)
+            else:
+                results = await self.flush(items)
+            if len(results) != len(items):
+                raise ValueError(f"Batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(items)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class ConnectionPool:
+    """Fixed-size pool of blocking DB-API connections used from worker threads"""
+
+    def __init__(self, dsn: str, size: int = DEFAULT_NODE_CONCURRENCY):
+        self.dsn = dsn
+        self.size = size
+        self._connect = _connector(dsn)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+
+    async def _acquire(self):
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            try:
+                return await asyncio.to_thread(self._connect)
+            except Exception:
+                self._created -= 1
+                raise
+        return await self._idle.get()
+
+    async def run(self, fn: Callable[[Any], Any]) -> Any:
+        """Run `fn(connection)` in a worker thread on a pooled connection"""
+        connection = await self._acquire()
+        try:
+            return await asyncio.to_thread(fn, connection)
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def close(self):
+        while not self._idle.empty():
+            connection = self._idle.get_nowait()
+            await asyncio.to_thread(connection.close)
+
+
+def _connector(dsn: str) -> Callable[[], Any]:
+    """
+    Return a connection factory for a DSN. Only sqlite is available offline;
+    other schemes need their DB-API driver installed
+    """
+    scheme = urlsplit(dsn).scheme
+    if scheme in ("sqlite", ""):
+        path = dsn[len("sqlite:///"):] if dsn.startswith("sqlite:///") else dsn
+        path = path or ":memory:"
+
+        def connect():
+            connection = sqlite3.connect(path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            return connection
+        return connect
+    raise ValueError(f"Unsupported database DSN scheme: {scheme}")
+
+
+def query_params(record: Any) -> Any:
+    """Map a record to DB-API parameters: dicts bind by name, sequences by position"""
+    if isinstance(record, dict):
+        return record
+    if isinstance(record, (list, tuple)):
+        return tuple(record)
+    return (record,)
+
+
+def is_read_query(query: str) -> bool:
+    return query.lstrip().lower().startswith(READ_STATEMENTS)
+
+
+def _run_queries(query: str, params: List[Any], batched: bool = False) -> Callable[[Any], List[Any]]:
+    """
+    Build the worker-thread function executing a whole batch on one connection.
+    executemany only reports a total, so writes of a batching node return it
+    as `batch_rowcount` alongside `batch_size` rather than as a per-record
+    count - also when a record happened to be flushed alone, so every record
+    of the node has the same shape
+    """
+    def run(connection) -> List[Any]:
+        if is_read_query(query):
+            return [[dict(row) for row in connection.execute(query, p).fetchall()] for p in params]
+        with connection:
+            cursor = connection.executemany(query, params)
+        if not batched:
+            return [{"rowcount": cursor.rowcount} for _ in params]
+        return [{"batch_rowcount": cursor.rowcount, "batch_size": len(params)} for _ in params]
+    return run
+
+
+class _LoopState:
+    """Loop-bound I/O objects (clients, pools, semaphores, batchers) of one event loop"""
+
+    def __init__(self):
+        self.http_clients: Dict[str, httpx.AsyncClient] = {}
+        self.db_pools: Dict[str, ConnectionPool] = {}
+        self.semaphores: Dict[Tuple[str, int], asyncio.Semaphore] = {}
+        self.batchers: Dict[Tuple[Any, ...], MicroBatcher] = {}
+
+    async def aclose(self):
+        for client in self.http_clients.values():
+            await client.aclose()
+        for pool in self.db_pools.values():
+            await pool.close()
+
+
+class IOManager:
+    """
+    Shared I/O subsystem for `api` and `database` nodes.
+
+    Keeps one pooled httpx.AsyncClient per host and one connection pool per
+    DSN for the lifetime of the manager, caps concurrent physical calls per
+    node, and optionally coalesces per-record calls into bulk HTTP requests
+    or `executemany`. Clients, pools and locks bind to an event loop, so they
+    are kept per running loop and closed when that loop shuts down; one
+    manager can serve successive asyncio.run() calls.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 http_transport: Optional[httpx.AsyncBaseTransport] = None,
+                 timeout: float = 30.0):
+        """
+        Args:
+            max_connections: Connection limit of each per-host HTTP pool
+            http_transport: Optional transport (e.g. httpx.MockTransport) used
+                instead of the network, for offline runs and benchmarks
+            timeout: HTTP timeout in seconds
+        """
+        self.max_connections = max_connections
+        self.http_transport = http_transport
+        self.timeout = timeout
+        self._states = LoopLocal(_LoopState, _LoopState.aclose)
+
+    def _state(self) -> _LoopState:
+        return self._states.get()
+
+    def http_client(self, url: str) -> httpx.AsyncClient:
+        """Pooled client for the URL's host"""
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}"
+        clients = self._state().http_clients
+        client = clients.get(key)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            client = httpx.AsyncClient(limits=limits, timeout=self.timeout, transport=self.http_transport)
+            clients[key] = client
+        return client
+
+    def db_pool(self, dsn: str, size: int = DEFAULT_NODE_CONCURRENCY) -> ConnectionPool:
+        """Connection pool for the DSN"""
+        pools = self._state().db_pools
+        pool = pools.get(dsn)
+        if pool is None:
+            pool = pools[dsn] = ConnectionPool(dsn, size)
+        return pool
+
+    def node_semaphore(self, node_id: str, limit: int) -> asyncio.Semaphore:
+        """Per-node cap on concurrent physical calls"""
+        semaphores = self._state().semaphores
+        semaphore = semaphores.get((node_id, limit))
+        if semaphore is None:
+            semaphore = semaphores[(node_id, limit)] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def batcher(self, key: Tuple[Any, ...], flush: Callable[[List[Any]], Awaitable[List[Any]]],
+                max_batch_size: int, max_wait: float, limit: int) -> MicroBatcher:
+        """
+        Micro-batcher for a call key. The key must cover everything `flush`
+        closes over (node, target, headers, settings) so a changed node
+        configuration never reuses a stale batcher
+        """
+        batchers = self._state().batchers
+        batcher = batchers.get(key)
+        if batcher is None:
+            batcher = batchers[key] = MicroBatcher(flush, max_batch_size, max_wait, max_concurrency=limit)
+        return batcher
+
+    async def request(self, node_id: str, method: str, url: str, limit: int = DEFAULT_NODE_CONCURRENCY,
+                      **kwargs) -> httpx.Response:
+        """Single HTTP request through the host pool, under the node's limit"""
+        async with self.node_semaphore(node_id, limit):
+            response = await self.http_client(url).request(method, url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def bulk_request(self, node_id: str, url: str, payload: Any, method: str = "POST",
+                           headers: Optional[Dict[str, str]] = None, max_batch_size: int = 32,
+                           max_wait: float = DEFAULT_BATCH_WAIT, limit: int = DEFAULT_NODE_CONCURRENCY) -> Any:
+        """
+        Coalesce per-record payloads into one request carrying a JSON array to
+        `url`; the endpoint must answer with a JSON array of the same length
+        """
+        method = method.upper()
+        if method not in BULK_METHODS:
+            raise ValueError(f"Batched API calls need one of {BULK_METHODS}, not {method}")
+        headers = headers or {}
+
+        async def flush(payloads: List[Any]) -> List[Any]:
+            response = await self.http_client(url).request(method, url, json=payloads, headers=headers)
+            response.raise_for_status()
+            return response.json()
+
+        key = ("http", node_id, method, url, tuple(sorted(headers.items())), max_batch_size, max_wait, limit)
+        return await self.batcher(key, flush, max_batch_size, max_wait, limit).submit(payload)
+
+    async def query(self, node_id: str, dsn: str, query: str, params: Any,
+                    max_batch_size: int = 1, max_wait: float = DEFAULT_BATCH_WAIT,
+                    limit: int = DEFAULT_NODE_CONCURRENCY) -> Any:
+        """
+        Run a query for one record. With max_batch_size > 1 concurrent records
+        share one worker-thread hop: writes go through `executemany` in a
+        single transaction, reads run back to back on one connection.
+
+        Returns:
+            List of row dicts for reads; for writes {"rowcount": n}, or
+            {"batch_rowcount": total, "batch_size": k} when max_batch_size > 1
+        """
+        pool = self.db_pool(dsn, limit)
+        if max_batch_size <= 1:
+            async with self.node_semaphore(node_id, limit):
+                results = await pool.run(_run_queries(query, [params]))
+            return results[0]
+
+        async def flush(batch: List[Any]) -> List[Any]:
+            return await pool.run(_run_queries(query, batch, batched=True))
+
+        key = ("db", node_id, dsn, query, max_batch_size, max_wait, limit)
+        return await self.batcher(key, flush, max_batch_size, max_wait, limit).submit(params)
+
+    async def aclose(self):
+        """Close the pooled HTTP clients and DB connections of the running loop"""
+        state = self._states.pop()
+        if state is not None:
+            await state.aclose()
+
+
+_io_manager: Optional[IOManager] = None
+
+
+def get_io_manager() -> IOManager:
+    """Process-wide IOManager shared by all pipeline runs"""
+    global _io_manager
+    if _io_manager is None:
+        _io_manager = IOManager()
+    return _io_manager
+
+
+def set_io_manager(manager: Optional[IOManager]):
+    """Replace the shared IOManager (e.g. with one using a stub transport)"""
+    global _io_manager
+    _io_manager = manager
@@ -0,0 +1,268 @@
+# backend/pipeline_layout.py
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+import numpy as np
+
+from pipeline_analyzer import PipelineAnalyzer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAYER_SPACING = 250.0
+DEFAULT_NODE_SPACING = 120.0
+DEFAULT_SWEEPS = 8
+DEFAULT_COORDINATE_PASSES = 4
+
+
+def break_cycles(node_ids: List[str], edges: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Drop self-loops and DFS back edges so the remaining edges form a DAG.
+    Iterative, so arbitrarily deep pipelines do not hit the recursion limit
+    """
+    adjacency: Dict[str, List[str]] = defaultdict(list)
+    for source, target in edges:
+        if source != target:
+            adjacency[source].append(target)
+
+    WHITE, GRAY, BLACK = 0, 1, 2
+    colors = {node_id: WHITE for node_id in node_ids}
+    kept: List[Tuple[str, str]] = []
+
+    for root in node_ids:
+        if colors[root] != WHITE:
+            continue
+        colors[root] = GRAY
+        stack = [(root, iter(adjacency[root]))]
+        while stack:
+            node, neighbors = stack[-1]
+            for neighbor in neighbors:
+                if colors.get(neighbor) == GRAY:
+                    continue  # back edge - would close a cycle
+                kept.append((node, neighbor))
+                if colors.get(neighbor) == WHITE:
+                    colors[neighbor] = GRAY
+                    stack.append((neighbor, iter(adjacency[neighbor])))
+                    break
+            else:
+                colors[node] = BLACK
+                stack.pop()
+
+    return kept
+
+
+def assign_layers(node_ids: List[str], edges: List[Tuple[str, str]]) -> Dict[str, int]:
+    """Layer assignment from the analyzer's topological levels (edges must be acyclic)"""
+    analyzer = PipelineAnalyzer()
+    analyzer.build_graph(node_ids, edges)
+    levels = analyzer.get_topological_levels()
+    if levels is None:
+        raise ValueError("Layer assignment requires an acyclic graph")
+    return levels
+
+
+def _rank_within_layers(layer: np.ndarray, *keys: np.ndarray) -> np.ndarray:
+    """Position of every node inside its layer when sorted by `keys` (last key is primary)"""
+    order = np.lexsort(keys + (layer,))
+    sorted_layers = layer[order]
+    starts = np.searchsorted(sorted_layers, sorted_layers, side="left")
+    rank = np.empty(len(layer), dtype=np.float64)
+    rank[order] = np.arange(len(layer)) - starts
+    return rank
+
+
+def _barycenters(values: np.ndarray, neighbor: np.ndarray, node: np.ndarray) -> np.ndarray:
+    """Mean of `values[neighbor]` per `node`; nodes without neighbours keep their own value"""
+    size = len(values)
+    sums = np.bincount(node, weights=values[neighbor], minlength=size)
+    counts = np.bincount(node, minlength=size)
+    return np.where(counts > 0, sums / np.maximum(counts, 1), values)
+
+
+def _segmented_accumulate(values: np.ndarray, layer_sorted: np.ndarray, reverse: bool) -> np.ndarray:
+    """Running max (or reverse running min) restarting at every layer boundary"""
+    step = float(np.ptp(values)) + 1.0
+    shifted = values + layer_sorted * step
+    if reverse:
+        shifted = np.minimum.accumulate(shifted[::-1])[::-1]
+    else:
+        shifted = np.maximum.accumulate(shifted)
+    return shifted - layer_sorted * step
+
+
+def layered_layout(node_ids: List[str], edges: List[Tuple[str, str]], layers: Dict[str, int],
+                   layer_spacing: float = DEFAULT_LAYER_SPACING,
+                   node_spacing: float = DEFAULT_NODE_SPACING,
+                   sweeps: int = DEFAULT_SWEEPS) -> Dict[str, Dict[str, float]]:
+    """
+    Sugiyama-style layout of an acyclic, layered graph.
+
+    Crossing reduction runs alternating down/up barycenter sweeps; each sweep
+    updates every layer at once from the previous ordering, so the cost is a
+    handful of numpy passes over the edge arrays regardless of graph depth.
+    Coordinate assignment pulls every node towards the mean height of its
+    neighbours while keeping the sweep order and at least `node_spacing`
+    between nodes of a layer. Layers run left to right.
+
+    Returns:
+        Mapping of node ID to {"x": ..., "y": ...}
+    """
+    count = len(node_ids)
+    if count == 0:
+        return {}
+
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    layer = np.fromiter((layers[node_id] for node_id in node_ids), dtype=np.int64, count=count)
+    src = np.fromiter((index[source] for source, _ in edges), dtype=np.int64, count=len(edges))
+    dst = np.fromiter((index[target] for _, target in edges), dtype=np.int64, count=len(edges))
+
+    layer_sizes = np.bincount(layer)
+    tie_break = np.arange(count, dtype=np.float64)
+
+    # Crossing reduction: positions are centred per layer so barycenters are
+    # comparable across layers of different widths
+    rank = _rank_within_layers(layer, tie_break)
+    for sweep in range(sweeps):
+        centred = rank - (layer_sizes[layer] - 1) / 2.0
+        if sweep % 2 == 0:
+            keys = _barycenters(centred, src, dst)
+        else:
+            keys = _barycenters(centred, dst, src)
+        rank = _rank_within_layers(layer, tie_break, rank, keys)
+
+    # Coordinate assignment
+    order = np.lexsort((rank, layer))
+    layer_sorted = layer[order].astype(np.float64)
+    rank_sorted = rank[order]
+    y = (rank - (layer_sizes[layer] - 1) / 2.0) * node_spacing
+    if len(edges):
+        both_neighbors = np.concatenate((src, dst))
+        both_nodes = np.concatenate((dst, src))
+        for _ in range(DEFAULT_COORDINATE_PASSES):
+            target = _barycenters(y, both_neighbors, both_nodes)
+            slack = target[order] - rank_sorted * node_spacing
+            pushed_down = _segmented_accumulate(slack, layer_sorted, reverse=False)
+            pushed_up = _segmented_accumulate(slack, layer_sorted, reverse=True)
+            y[order] = (pushed_down + pushed_up) / 2.0 + rank_sorted * node_spacing
+
+    x = layer * layer_spacing
+    y = y - y.min()
+    return {
+        node_id: {"x": float(x[i]), "y": float(y[i])}
+        for i, node_id in enumerate(node_ids)
+    }
+
+
+def _neighborhood(changed: Set[str], edges: List[Tuple[str, str]], radius: int) -> Set[str]:
+    """Changed nodes plus everything within `radius` hops, ignoring edge direction"""
+    undirected: Dict[str, List[str]] = defaultdict(list)
+    for source, target in edges:
+        undirected[source].append(target)
+        undirected[target].append(source)
+
+    affected = set(changed)
+    frontier = deque((node_id, 0) for node_id in changed)
+    while frontier:
+        node_id, depth = frontier.popleft()
+        if depth == radius:
+            continue
+        for neighbor in undirected[node_id]:
+            if neighbor not in affected:
+                affected.add(neighbor)
+                frontier.append((neighbor, depth + 1))
+    return affected
+
+
+def incremental_layout(node_ids: List[str], edges: List[Tuple[str, str]], layers: Dict[str, int],
+                       positions: Dict[str, Dict[str, float]], changed: Iterable[str],
+                       radius: int = 1,
+                       layer_spacing: float = DEFAULT_LAYER_SPACING,
+                       node_spacing: float = DEFAULT_NODE_SPACING) -> Dict[str, Dict[str, float]]:
+    """
+    Re-lay out only the changed nodes and their `radius`-hop neighbourhood.
+
+    Every other node keeps its current position. Affected nodes are placed in
+    layer order one column to the right of their placed parents (or left of
+    their placed children), at the mean height of their placed neighbours,
+    then nudged to the nearest grid slot not already taken.
+
+    Returns:
+        Positions of the re-laid-out nodes only
+    """
+    known = set(node_ids)
+    affected = _neighborhood({node_id for node_id in changed if node_id in known}, edges, radius)
+    if not affected:
+        return {}
+
+    parents: Dict[str, List[str]] = defaultdict(list)
+    children: Dict[str, List[str]] = defaultdict(list)
+    for source, target in edges:
+        parents[target].append(source)
+        children[source].append(target)
+
+    placed = {node_id: positions[node_id] for node_id in node_ids if node_id not in affected}
+
+    def slot(position: Dict[str, float]) -> Tuple[int, int]:
+        return round(position["x"] / layer_spacing), round(position["y"] / node_spacing)
+
+    occupied = {slot(position) for position in placed.values()}
+    input_order = {node_id: i for i, node_id in enumerate(node_ids)}
+    result: Dict[str, Dict[str, float]] = {}
+
+    for node_id in sorted(affected, key=lambda n: (layers[n], input_order[n])):
+        placed_parents = [placed[p] for p in parents[node_id] if p in placed]
+        placed_children = [placed[c] for c in children[node_id] if c in placed]
+        if placed_parents:
+            x = max(p["x"] for p in placed_parents) + layer_spacing
+        elif placed_children:
+            x = min(c["x"] for c in placed_children) - layer_spacing
+        else:
+            x = layers[node_id] * layer_spacing
+
+        neighbors = placed_parents + placed_children
+        if neighbors:
+            y = sum(n["y"] for n in neighbors) / len(neighbors)
+        else:
+            y = positions.get(node_id, {}).get("y", 0.0)
+
+        column, row = slot({"x": x, "y": y})
+        offset = 0
+        while (column, row + offset) in occupied:
+            offset = -offset if offset > 0 else -offset + 1
+        row += offset
+        occupied.add((column, row))
+
+        position = {"x": float(x), "y": float(row * node_spacing if offset else y)}
+        placed[node_id] = position
+        result[node_id] = position
+
+    return result
+
+
+def compute_layout(node_ids: List[str], edges: List[Tuple[str, str]],
+                   positions: Optional[Dict[str, Dict[str, float]]] = None,
+                   changed: Optional[Iterable[str]] = None,
+                   radius: int = 1,
+                   layer_spacing: float = DEFAULT_LAYER_SPACING,
+                   node_spacing: float = DEFAULT_NODE_SPACING) -> Tuple[Dict[str, Dict[str, float]], int]:
+    """
+    Full or incremental layered layout of a pipeline
+
+    Args:
+        node_ids: Node IDs in editor order (used as the initial in-layer order)
+        edges: (source, target) pairs; cycles are broken before layering
+        positions: Current positions, required for incremental mode
+        changed: Node IDs to re-lay out; None means a full layout
+        radius: Neighbourhood size around changed nodes in incremental mode
+
+    Returns:
+        (positions by node ID, number of layers)
+    """
+    acyclic = break_cycles(node_ids, edges)
+    layers = assign_layers(node_ids, acyclic)
+    num_layers = max(layers.values()) + 1 if layers else 0
+
+    if changed is not None:
+        return incremental_layout(node_ids, acyclic, layers, positions or {}, changed, radius,
+                                  layer_spacing, node_spacing), num_layers
+    return layered_layout(node_ids, acyclic, layers, layer_spacing, node_spacing), num_layers